@@ -1,33 +1,86 @@
 # main.py
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Body, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, func
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.datastructures import Headers
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+from sqlalchemy import Index, delete, event, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
+import hashlib
+import logging
+import orjson
 import os
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./expenses.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+# Writes use INSERT/UPDATE/DELETE ... RETURNING, which needs SQLite 3.35+
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./expenses.db"
+# aiosqlite defaults to NullPool; pool connections so the PRAGMAs below run
+# once per connection rather than once per request
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=10,
+    max_overflow=20,
+)
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer instead of queueing behind it
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+# Keep loaded attributes after commit so returned rows aren't re-SELECTed
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+class Base(DeclarativeBase):
+    pass
+
+# Timestamps are computed by SQLite inside the INSERT instead of a Python
+# callback per row; kept to millisecond precision so date ordering is stable
+SQLITE_UTC_NOW = func.strftime("%Y-%m-%d %H:%M:%f", "now")
 
 # Database Models
 class Expense(Base):
     __tablename__ = "expenses"
     
-    id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    description = Column(String, nullable=False)
-    category = Column(String, nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    amount: Mapped[float]
+    description: Mapped[str]
+    category: Mapped[str]
+    date: Mapped[datetime] = mapped_column(default=SQLITE_UTC_NOW, index=True)
+    created_at: Mapped[datetime] = mapped_column(default=SQLITE_UTC_NOW)
+
+    # Serves "WHERE category = ? ORDER BY date" without a scan or temp sort
+    __table_args__ = (Index("ix_exp_cat_date", "category", "date"),)
+
+def create_schema(connection):
+    # Create tables
+    Base.metadata.create_all(bind=connection)
+    
+    # create_all() skips tables that already exist, so add any missing indexes
+    # to databases created before they were declared
+    for index in Expense.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+    
+    # The rowid primary key is already indexed; drop the duplicate older
+    # databases were created with
+    connection.execute(text("DROP INDEX IF EXISTS ix_expenses_id"))
 
 # Pydantic Models
 class ExpenseBase(BaseModel):
@@ -43,8 +96,10 @@ class ExpenseResponse(ExpenseBase):
     date: datetime
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+# Built once so list responses reuse the compiled validator and serializer
+EXPENSE_LIST_ADAPTER = TypeAdapter(List[ExpenseResponse])
 
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = Field(None, gt=0)
@@ -67,11 +122,80 @@ class StatsResponse(BaseModel):
     total_expenses: int
     categories: List[CategoryStats]
 
+logger = logging.getLogger(__name__)
+
+# Response cache setup
+REDIS_URL = os.getenv("REDIS_URL")
+EXPENSES_CACHE_NAMESPACE = "expenses"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as connection:
+        await connection.run_sync(create_schema)
+        # Populate sqlite_stat1 so the planner chooses indexes from real
+        # statistics; the sampling limit keeps startup fast on large tables
+        await connection.execute(text("PRAGMA analysis_limit=1000"))
+        await connection.execute(text("ANALYZE"))
+    
+    # Fall back to a per-process cache when no Redis instance is configured
+    redis = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+    backend = RedisBackend(redis) if redis else InMemoryBackend()
+    FastAPICache.init(backend, prefix="exp")
+    yield
+    if redis:
+        await redis.close()
+    await engine.dispose()
+
+def normalize_category_filter(category: Optional[str]) -> Optional[str]:
+    """Fold every spelling of the "all" filter to "all"; other values pass through"""
+    if category and category.lower() == "all":
+        return "all"
+    return category
+
+def endpoint_key_builder(
+    func,
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response=None,
+    args=(),
+    kwargs=None
+):
+    """Key cached responses on the endpoint function alone"""
+    return f"{namespace}:{func.__name__}"
+
+def category_key_builder(
+    func,
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response=None,
+    args=(),
+    kwargs=None
+):
+    """Key cached responses on the endpoint function and its category filter
+
+    Other query parameters are ignored so they can't mint new cache entries;
+    invalid categories raise before anything is stored.
+    """
+    category = normalize_category_filter((kwargs or {}).get("category"))
+    return f"{namespace}:{func.__name__}:{category}"
+
+async def invalidate_expense_cache():
+    # The write has already committed, so a cache outage must not turn it
+    # into an error response; stale entries still expire on their own
+    try:
+        await FastAPICache.clear(namespace=EXPENSES_CACHE_NAMESPACE)
+    except Exception:
+        logger.warning("Error clearing the expenses response cache:", exc_info=True)
+
 # FastAPI app
 app = FastAPI(
     title="Expense Tracker API",
     description="A comprehensive API for tracking personal expenses",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -83,72 +207,178 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conditional GET support for idempotent read endpoints
+ETAG_PATHS = frozenset({"/categories", "/expenses/stats", "/expenses/total"})
+ETAG_CACHE_CONTROL = "public, max-age=15, stale-while-revalidate=30"
+
+class ETagMiddleware:
+    """Add ETag/Cache-Control to ETAG_PATHS GET responses and answer 304s
+
+    Written as plain ASGI so every other request, including the streamed
+    expense list, passes straight through without being buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in ETAG_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        body_parts = []
+        
+        async def buffer_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+        
+        await self.app(scope, receive, buffer_send)
+        body = b"".join(body_parts)
+        
+        if start_message["status"] != 200:
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = [
+            (key, value) for key, value in start_message["headers"]
+            if key.lower() not in (b"content-length", b"etag", b"cache-control")
+        ]
+        headers.append((b"etag", etag.encode()))
+        headers.append((b"cache-control", ETAG_CACHE_CONTROL.encode()))
+        
+        # Clients revalidating with a matching ETag (or "*") get an empty 304
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+app.add_middleware(ETagMiddleware)
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Available categories
 CATEGORIES = [
     "Food", "Transportation", "Entertainment", "Shopping", 
     "Bills", "Health", "Other"
 ]
+CATEGORY_SET = frozenset(CATEGORIES)
+INVALID_CATEGORY_MESSAGE = f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
+
+# Static response bodies, encoded once at import
+ROOT_BODY = orjson.dumps({"message": "Expense Tracker API", "version": "1.0.0"})
+CATEGORIES_BODY = orjson.dumps({"categories": CATEGORIES})
+
+EXPENSE_STREAM_CHUNK_SIZE = 200
+MAX_BULK_EXPENSES = 1000
+
+def encode_expense_chunk(chunk):
+    """Encode a chunk of expenses as JSON array items, without the brackets"""
+    return EXPENSE_LIST_ADAPTER.dump_json(EXPENSE_LIST_ADAPTER.validate_python(chunk))[1:-1]
+
+async def stream_expenses(db, partitions, first_body):
+    """Write the JSON array, encoding the remaining rows one chunk at a time"""
+    try:
+        yield b"[" + first_body
+        async for chunk in partitions:
+            yield b"," + encode_expense_chunk(chunk)
+        yield b"]"
+    finally:
+        await db.close()
 
 # API Endpoints
 
 @app.get("/")
 async def root():
-    return {"message": "Expense Tracker API", "version": "1.0.0"}
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 @app.get("/categories")
 async def get_categories():
     """Get all available expense categories"""
-    return {"categories": CATEGORIES}
+    return Response(content=CATEGORIES_BODY, media_type="application/json")
 
 @app.post("/expenses", response_model=ExpenseResponse)
-async def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
+async def create_expense(expense: ExpenseCreate, db: AsyncSession = Depends(get_db)):
     """Create a new expense"""
-    if expense.category not in CATEGORIES:
+    if expense.category not in CATEGORY_SET:
         raise HTTPException(
             status_code=400, 
-            detail=f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
+            detail=INVALID_CATEGORY_MESSAGE
         )
     
-    db_expense = Expense(
-        amount=expense.amount,
-        description=expense.description.strip(),
-        category=expense.category
-    )
-    
-    db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    # INSERT ... RETURNING yields the stored row without a follow-up SELECT
+    db_expense = (await db.execute(
+        insert(Expense).values(
+            amount=expense.amount,
+            description=expense.description.strip(),
+            category=expense.category
+        ).returning(Expense)
+    )).scalar_one()
+    await db.commit()
+    await invalidate_expense_cache()
     
     return db_expense
 
+@app.post("/expenses/bulk")
+async def create_expenses_bulk(
+    # The length check rejects oversized batches before any item is validated
+    expenses: Annotated[List[ExpenseCreate], Body(min_length=1, max_length=MAX_BULK_EXPENSES)],
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many expenses in a single transaction"""
+    if any(expense.category not in CATEGORY_SET for expense in expenses):
+        raise HTTPException(
+            status_code=400, 
+            detail=INVALID_CATEGORY_MESSAGE
+        )
+    
+    # One executemany INSERT and a single COMMIT for the whole batch
+    await db.execute(insert(Expense), [
+        {
+            "amount": expense.amount,
+            "description": expense.description.strip(),
+            "category": expense.category
+        }
+        for expense in expenses
+    ])
+    await db.commit()
+    await invalidate_expense_cache()
+    
+    return {"message": "Expenses created successfully", "created_count": len(expenses)}
+
 @app.get("/expenses", response_model=List[ExpenseResponse])
 async def get_expenses(
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of expenses to return"),
     offset: int = Query(0, ge=0, description="Number of expenses to skip"),
     sort_by: str = Query("date", description="Sort by: date, amount, category"),
-    sort_order: str = Query("desc", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db)
+    sort_order: str = Query("desc", description="Sort order: asc or desc")
 ):
     """Get all expenses with optional filtering and pagination"""
-    query = db.query(Expense)
+    query = select(Expense)
     
     # Apply category filter
     if category and category.lower() != "all":
-        if category not in CATEGORIES:
+        if category not in CATEGORY_SET:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
+                detail=INVALID_CATEGORY_MESSAGE
             )
-        query = query.filter(Expense.category == category)
+        query = query.where(Expense.category == category)
     
     # Apply sorting
     sort_column = getattr(Expense, sort_by, Expense.date)
@@ -158,97 +388,79 @@ async def get_expenses(
         query = query.order_by(sort_column.asc())
     
     # Apply pagination
-    expenses = query.offset(offset).limit(limit).all()
-    
-    return expenses
-
-@app.get("/expenses/{expense_id}", response_model=ExpenseResponse)
-async def get_expense(expense_id: int, db: Session = Depends(get_db)):
-    """Get a specific expense by ID"""
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    return expense
-
-@app.put("/expenses/{expense_id}", response_model=ExpenseResponse)
-async def update_expense(
-    expense_id: int, 
-    expense_update: ExpenseUpdate, 
-    db: Session = Depends(get_db)
-):
-    """Update a specific expense"""
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    
-    # Update fields if provided
-    if expense_update.amount is not None:
-        expense.amount = expense_update.amount
-    if expense_update.description is not None:
-        expense.description = expense_update.description.strip()
-    if expense_update.category is not None:
-        if expense_update.category not in CATEGORIES:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
-            )
-        expense.category = expense_update.category
-    
-    db.commit()
-    db.refresh(expense)
+    query = query.offset(offset).limit(limit).execution_options(yield_per=EXPENSE_STREAM_CHUNK_SIZE)
     
-    return expense
-
-@app.delete("/expenses/{expense_id}")
-async def delete_expense(expense_id: int, db: Session = Depends(get_db)):
-    """Delete a specific expense"""
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    
-    db.delete(expense)
-    db.commit()
+    # Run the query and encode the first chunk before any headers go out, so
+    # DB and validation errors surface as a 500 instead of a truncated 200.
+    # A streamed response outlives the request's dependencies, so it owns
+    # this session and closes it once the body is written.
+    db = SessionLocal()
+    try:
+        result = await db.stream_scalars(query)
+        partitions = result.partitions()
+        first_chunk = await anext(partitions, None)
+        first_body = encode_expense_chunk(first_chunk) if first_chunk else b""
+        
+        # A page that fits in one chunk is already complete; release the
+        # connection now rather than holding it while the client reads
+        if (
+            limit <= EXPENSE_STREAM_CHUNK_SIZE
+            or first_chunk is None
+            or len(first_chunk) < EXPENSE_STREAM_CHUNK_SIZE
+        ):
+            await result.close()
+            await db.close()
+            return Response(content=b"[" + first_body + b"]", media_type="application/json")
+    except BaseException:
+        await db.close()
+        raise
     
-    return {"message": "Expense deleted successfully"}
+    return StreamingResponse(stream_expenses(db, partitions, first_body), media_type="application/json")
 
+# Fixed paths must be declared before /expenses/{expense_id}, which would
+# otherwise capture them
 @app.get("/expenses/total", response_model=TotalResponse)
+@cache(expire=30, namespace=EXPENSES_CACHE_NAMESPACE, key_builder=category_key_builder)
 async def get_total(
     category: Optional[str] = Query(None, description="Filter by category"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get total amount and count of expenses"""
-    query = db.query(func.sum(Expense.amount), func.count(Expense.id))
+    # Echo the same spelling the cache key uses, so cached responses agree
+    category = normalize_category_filter(category)
+    query = select(func.sum(Expense.amount), func.count(Expense.id))
     
     if category and category.lower() != "all":
-        if category not in CATEGORIES:
+        if category not in CATEGORY_SET:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
+                detail=INVALID_CATEGORY_MESSAGE
             )
-        query = query.filter(Expense.category == category)
+        query = query.where(Expense.category == category)
     
-    result = query.first()
+    result = (await db.execute(query)).one()
     total = result[0] if result[0] else 0.0
     count = result[1] if result[1] else 0
     
     return TotalResponse(total=total, count=count, category=category)
 
 @app.get("/expenses/stats", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)):
+@cache(expire=30, namespace=EXPENSES_CACHE_NAMESPACE, key_builder=endpoint_key_builder)
+async def get_stats(db: AsyncSession = Depends(get_db)):
     """Get comprehensive expense statistics by category"""
-    # Get total amount and count
-    total_result = db.query(func.sum(Expense.amount), func.count(Expense.id)).first()
-    total_amount = total_result[0] if total_result[0] else 0.0
-    total_expenses = total_result[1] if total_result[1] else 0
+    # Totals are derived from the per-category breakdown, so one scan suffices
+    category_results = (await db.execute(
+        select(
+            Expense.category,
+            func.sum(Expense.amount),
+            func.count(Expense.id)
+        ).group_by(Expense.category).order_by(func.sum(Expense.amount).desc())
+    )).all()
     
-    # Get category breakdown
-    category_stats = []
-    category_results = db.query(
-        Expense.category,
-        func.sum(Expense.amount),
-        func.count(Expense.id)
-    ).group_by(Expense.category).all()
+    total_amount = sum((amount for _, amount, _ in category_results), 0.0)
+    total_expenses = sum(count for _, _, count in category_results)
     
+    category_stats = []
     for category, amount, count in category_results:
         percentage = (amount / total_amount * 100) if total_amount > 0 else 0
         category_stats.append(CategoryStats(
@@ -258,20 +470,75 @@ async def get_stats(db: Session = Depends(get_db)):
             percentage=round(percentage, 2)
         ))
     
-    # Sort by total amount (descending)
-    category_stats.sort(key=lambda x: x.total, reverse=True)
-    
     return StatsResponse(
         total_amount=total_amount,
         total_expenses=total_expenses,
         categories=category_stats
     )
 
+@app.get("/expenses/{expense_id}", response_model=ExpenseResponse)
+async def get_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a specific expense by ID"""
+    expense = await db.get(Expense, expense_id)
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return expense
+
+@app.put("/expenses/{expense_id}", response_model=ExpenseResponse)
+async def update_expense(
+    expense_id: int, 
+    expense_update: ExpenseUpdate, 
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a specific expense"""
+    # Only fields the client actually sent (and didn't null out) are updated.
+    # The patch is validated before the row is touched, so an invalid category
+    # on a missing id is a 400 rather than a 404.
+    values = expense_update.model_dump(exclude_unset=True, exclude_none=True)
+    if "category" in values and values["category"] not in CATEGORY_SET:
+        raise HTTPException(
+            status_code=400, 
+            detail=INVALID_CATEGORY_MESSAGE
+        )
+    if "description" in values:
+        values["description"] = values["description"].strip()
+    
+    if not values:
+        expense = await db.get(Expense, expense_id)
+        if not expense:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        return expense
+    
+    # UPDATE ... RETURNING writes and refetches the row in one statement
+    expense = (await db.execute(
+        update(Expense).where(Expense.id == expense_id).values(**values).returning(Expense)
+    )).scalar_one_or_none()
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    
+    await db.commit()
+    await invalidate_expense_cache()
+    
+    return expense
+
+@app.delete("/expenses/{expense_id}")
+async def delete_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
+    """Delete a specific expense"""
+    expense = await db.get(Expense, expense_id)
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    
+    await db.delete(expense)
+    await db.commit()
+    await invalidate_expense_cache()
+    
+    return {"message": "Expense deleted successfully"}
+
 @app.delete("/expenses")
 async def delete_all_expenses(
     category: Optional[str] = Query(None, description="Delete only expenses from this category"),
     confirm: bool = Query(False, description="Confirmation required"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete all expenses (with optional category filter)"""
     if not confirm:
@@ -280,22 +547,24 @@ async def delete_all_expenses(
             detail="Confirmation required. Add ?confirm=true to the request"
         )
     
-    query = db.query(Expense)
+    stmt = delete(Expense)
     
     if category and category.lower() != "all":
-        if category not in CATEGORIES:
+        if category not in CATEGORY_SET:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid category. Must be one of: {', '.join(CATEGORIES)}"
+                detail=INVALID_CATEGORY_MESSAGE
             )
-        query = query.filter(Expense.category == category)
+        stmt = stmt.where(Expense.category == category)
         message = f"All {category} expenses deleted successfully"
     else:
         message = "All expenses deleted successfully"
     
-    deleted_count = query.count()
-    query.delete()
-    db.commit()
+    # Count the deleted rows in the same pass as the DELETE itself
+    result = await db.execute(stmt.returning(Expense.id), execution_options={"synchronize_session": False})
+    deleted_count = len(result.all())
+    await db.commit()
+    await invalidate_expense_cache()
     
     return {"message": message, "deleted_count": deleted_count}
 
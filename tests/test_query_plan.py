@@ -0,0 +1,37 @@
+# tests/test_query_plan.py
+from sqlalchemy import create_engine, insert, text
+import pytest
+
+from main import CATEGORIES, Expense, create_schema
+
+LIST_BY_CATEGORY = "SELECT * FROM expenses WHERE category = :category ORDER BY date DESC LIMIT 100"
+LIST_ALL = "SELECT * FROM expenses ORDER BY date DESC LIMIT 100"
+
+@pytest.fixture
+def connection(tmp_path):
+    """Schema built the same way the app does at startup, with ANALYZE stats"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'expenses.db'}")
+    with engine.begin() as connection:
+        create_schema(connection)
+        connection.execute(insert(Expense), [
+            {"amount": i + 1, "description": f"expense {i}", "category": CATEGORIES[i % len(CATEGORIES)]}
+            for i in range(1000)
+        ])
+        connection.execute(text("ANALYZE"))
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+def query_plan(connection, sql, **params):
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+    return " | ".join(row[-1] for row in rows)
+
+def test_category_list_uses_composite_index(connection):
+    plan = query_plan(connection, LIST_BY_CATEGORY, category="Food")
+    assert "USING INDEX ix_exp_cat_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_unfiltered_list_uses_date_index(connection):
+    plan = query_plan(connection, LIST_ALL)
+    assert "USING INDEX ix_expenses_date" in plan
+    assert "TEMP B-TREE" not in plan